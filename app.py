@@ -10,6 +10,7 @@ import numpy as np
 from data_processors.raw_data import fetch_emails, fetch_starred_emails
 from data_processors.cleaned_content import generate_chained_emails
 from data_processors.spam_cleaning import process_spam_emails
+from data_processors.yakin_kopya import VARSAYILAN_ESIK, yakin_kopyalari_kumele
 
 # Generates a unique file name if a file with the same name exists
 def unique_file_name(file_path: Path) -> Path:
@@ -110,6 +111,14 @@ def parse_date(date_str):
     except:
         return None
 
+def parse_threshold(threshold_str):
+    # Near-duplicate similarity threshold from the form, falls back to the default
+    try:
+        threshold = float(threshold_str)
+    except (TypeError, ValueError):
+        return VARSAYILAN_ESIK
+    return threshold if 0 < threshold <= 1 else VARSAYILAN_ESIK
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     if request.method == "POST":
@@ -121,6 +130,7 @@ def index():
         start_date_raw = request.form.get("single_date") if date_type == "single" else request.form.get("range_start")
         end_date_raw = None if date_type == "single" else request.form.get("range_end")
         save_chart = request.form.get("save_chart") == "yes"
+        similarity_threshold = parse_threshold(request.form.get("similarity_threshold"))
 
         if not email or not password or not data_types or not formats:
             flash("Please fill all required fields!", "danger")
@@ -162,14 +172,22 @@ def index():
                         flash("❗ No cleaned data found, file not created.", "warning")
                         continue
 
+                    # Groups near-duplicate questions; adds "kume_id" to each cleaned record
+                    cluster_report = yakin_kopyalari_kumele(cleaned, esik=similarity_threshold)
+
                     if "json" in formats:
                         file_json = unique_file_name(downloads / f"{file_name}.json")
                         with open(file_json, "w", encoding="utf-8") as f:
                             json.dump(cleaned, f, ensure_ascii=False, indent=2)
+                        file_json = unique_file_name(downloads / f"{file_name}_clusters.json")
+                        with open(file_json, "w", encoding="utf-8") as f:
+                            json.dump(cluster_report, f, ensure_ascii=False, indent=2)
 
                     if "csv" in formats:
                         file_csv = unique_file_name(downloads / f"{file_name}.csv")
                         pd.DataFrame(cleaned).to_csv(file_csv, index=False)
+                        file_csv = unique_file_name(downloads / f"{file_name}_clusters.csv")
+                        pd.DataFrame(cluster_report).to_csv(file_csv, index=False)
 
                     if save_chart:
                         generate_and_save_chart(cleaned, "cleaned", today.strftime("%d%m%Y"), raw_data=raw_emails)
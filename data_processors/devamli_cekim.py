@@ -0,0 +1,391 @@
+import hashlib
+import imaplib
+import json
+import os
+import random
+import re
+import ssl
+import time
+from pathlib import Path
+
+# Yeniden bağlanma ve parça boyutu ayarları
+EN_FAZLA_DENEME = 8
+BEKLEME_TABANI = 2      # saniye
+BEKLEME_TAVANI = 300    # saniye
+BASLANGIC_PARCA = 100
+EN_KUCUK_PARCA = 5
+EN_BUYUK_PARCA = 500
+EN_BUYUK_PARCA_BAYT = 25 * 1024 * 1024  # Tek FETCH'te bellekte tutulacak en fazla mail boyutu
+BOYUT_SORGU_PARCA = 1000                 # RFC822.SIZE ön sorgusunda tek seferde sorulan UID sayısı
+ARAMA_PENCERESI = 50000  # Tek UID SEARCH'te aranan UID aralığı; yanıt satırı imaplib._MAXLINE'ı aşmasın diye
+BAGLANTI_ZAMAN_ASIMI = 60  # saniye
+KONTROL_KLASORU = Path.home() / ".mail_cekici" / "kontrol"  # kontrol_dosyasi verilmezse kullanılan klasör
+
+# Bağlantının koptuğunu gösteren hatalar (socket.timeout ve ssl.SSLError da OSError'dur)
+BAGLANTI_HATALARI = (imaplib.IMAP4.abort, OSError, EOFError)
+
+# Gmail'in yavaşlatma/kota yanıtlarında geçen ifadeler
+YAVASLATMA_ANAHTARLARI = [
+    "THROTTLED",
+    "OVERQUOTA",
+    "UNAVAILABLE",
+    "Too many",
+    "bandwidth",
+    "rate limit",
+]
+
+
+class SunucuYavaslatti(Exception):
+    # Sunucu isteği yavaşlatma/kota gerekçesiyle geri çevirdiğinde ([THROTTLED] vb.) yükseltilir
+    pass
+
+
+class UidvalidityDegisti(Exception):
+    # Yeniden bağlandıktan sonra klasörün UID alanı değiştiğinde yükseltilir
+    pass
+
+
+def yavaslatma_mi(metin):
+    # Sunucu mesajının yavaşlatma/kota uyarısı olup olmadığını kontrol et
+    if isinstance(metin, bytes):
+        metin = metin.decode(errors="ignore")
+    metin_lower = (metin or "").lower()
+    return any(anahtar.lower() in metin_lower for anahtar in YAVASLATMA_ANAHTARLARI)
+
+
+def yanit_hatasi(data):
+    # OK dönmeyen yanıtı hataya çevirir: yavaşlatma ise yeniden denenir, değilse (ör. [NONEXISTENT]) kalıcıdır
+    metin = b" ".join(parca for parca in (data or []) if isinstance(parca, bytes))
+    if yavaslatma_mi(metin):
+        return SunucuYavaslatti(data)
+    return imaplib.IMAP4.error(metin.decode(errors="ignore"))
+
+
+def varsayilan_kontrol_dosyasi(anahtar):
+    # İş anahtarından (ör. "gelen|kullanici|baslangic|bitis") dosya adına uygun, sabit bir kontrol dosyası yolu üretir
+    ozet = hashlib.sha1(anahtar.encode("utf-8")).hexdigest()[:16]
+    return KONTROL_KLASORU / f"{ozet}.json"
+
+
+def gmail_baglantisi(kullanici, sifre):
+    # DevamliCekim için, her çağrıldığında Gmail'e yeniden giriş yapan bağlantı fonksiyonu döner
+    def baglan():
+        context = ssl.create_default_context()
+        imap = imaplib.IMAP4_SSL("imap.gmail.com", port=993, ssl_context=context,
+                                 timeout=BAGLANTI_ZAMAN_ASIMI)
+        imap.login(kullanici, sifre)
+        return imap
+    return baglan
+
+
+def fetch_yanitini_bol(data):
+    # imap.fetch çıktısını (öznitelik metni, ham mail) çiftlerine dönüştürür;
+    # literal'den sonra gelen öznitelikler (ör. " FLAGS (\Seen))") da öznitelik metnine eklenir
+    kayitlar = []
+    for parca in data:
+        if isinstance(parca, tuple):
+            kayitlar.append([parca[0], parca[1]])
+        elif isinstance(parca, bytes) and kayitlar:
+            kayitlar[-1][0] += parca
+    return [(meta, govde) for meta, govde in kayitlar]
+
+
+def uid_al(meta):
+    # FETCH yanıtındaki "UID 123" değerini döner
+    if isinstance(meta, bytes):
+        meta = meta.decode(errors="ignore")
+    eslesme = re.search(r"UID (\d+)", meta)
+    return int(eslesme.group(1)) if eslesme else None
+
+
+class DevamliCekim:
+    """Klasörleri UID sırasıyla parça parça çeker, her parçadan sonra kontrol noktası yazar.
+
+    Bağlantı koparsa üstel bekleme ile yeniden bağlanır; sunucu yavaşlatırsa parça
+    boyutunu küçültür. Aynı kontrol dosyasıyla tekrar çalıştırıldığında kalan UID'den
+    devam eder. kontrol_dosyasi verilmezse anahtardan KONTROL_KLASORU altında bir yol
+    türetilir; anahtar da yoksa kayıtlar yalnızca bellekte tutulur.
+    """
+
+    def __init__(self, baglan, kontrol_dosyasi=None, anahtar=None):
+        self.baglan = baglan
+        if kontrol_dosyasi is None and anahtar:
+            kontrol_dosyasi = varsayilan_kontrol_dosyasi(anahtar)
+        self.kontrol_dosyasi = Path(kontrol_dosyasi) if kontrol_dosyasi else None
+        if self.kontrol_dosyasi:
+            self.kontrol_dosyasi.parent.mkdir(parents=True, exist_ok=True)
+        self.kayit_dosyasi = (self.kontrol_dosyasi.parent / (self.kontrol_dosyasi.name + ".kayitlar.jsonl")
+                              if self.kontrol_dosyasi else None)
+        self.anahtar = anahtar
+        self.imap = None
+        self.secili_klasor = None
+        self.uidvalidity = None
+        self.uidnext = None
+        self.mesaj_sayisi = 0
+        self.parca = BASLANGIC_PARCA
+        self.durum = self._kontrol_noktasi_oku()
+        self.bellek_kayitlari = []
+
+    # --- Kontrol noktası ---
+
+    def _kontrol_noktasi_oku(self):
+        # Kontrol dosyasını okur; yoksa veya farklı bir işe aitse sıfırdan başlar
+        bos = {"anahtar": self.anahtar, "klasorler": {}}
+        if not self.kontrol_dosyasi:
+            return bos
+        durum = None
+        if self.kontrol_dosyasi.exists():
+            try:
+                durum = json.loads(self.kontrol_dosyasi.read_text(encoding="utf-8"))
+            except Exception as e:
+                print("⚠️ Kontrol noktası okunamadı, baştan başlanıyor:", str(e))
+        if not durum or durum.get("anahtar") != self.anahtar:
+            # Boş durumdan başlanırken önceki işlerden kalan kayıtlar da silinir
+            if self.kayit_dosyasi.exists():
+                self.kayit_dosyasi.unlink()
+            return bos
+        return durum
+
+    def _kontrol_noktasi_yaz(self):
+        # Yarım yazılmış dosya kalmaması için önce geçici dosyaya yazıp yerine taşır
+        if not self.kontrol_dosyasi:
+            return
+        gecici = self.kontrol_dosyasi.with_name(self.kontrol_dosyasi.name + ".tmp")
+        gecici.write_text(json.dumps(self.durum, ensure_ascii=False), encoding="utf-8")
+        os.replace(gecici, self.kontrol_dosyasi)
+
+    def _kayitlari_ekle(self, klasor, uidvalidity, kayitlar):
+        # İşlenen kayıtları kontrol noktasından önce diske ekler
+        satirlar = [{"anahtar": self.anahtar, "klasor": klasor, "uidvalidity": uidvalidity, "uid": uid,
+                     "kayit": kayit}
+                    for uid, kayit in kayitlar]
+        if not self.kayit_dosyasi:
+            self.bellek_kayitlari.extend(satirlar)
+            return
+        with open(self.kayit_dosyasi, "a", encoding="utf-8") as f:
+            for satir in satirlar:
+                f.write(json.dumps(satir, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _kayitlari_yukle(self, klasor):
+        # Klasörün önceki ve şimdiki çalıştırmalarda işlenmiş kayıtlarını UID sırasıyla döner
+        if self.kayit_dosyasi:
+            satirlar = []
+            if self.kayit_dosyasi.exists():
+                with open(self.kayit_dosyasi, encoding="utf-8") as f:
+                    satirlar = [json.loads(satir) for satir in f if satir.strip()]
+        else:
+            satirlar = self.bellek_kayitlari
+
+        klasor_durumu = self.durum["klasorler"].get(klasor, {})
+        son_uid = klasor_durumu.get("son_uid", 0)
+        uidvalidity = klasor_durumu.get("uidvalidity")
+
+        # Kontrol noktasından sonra yazılmış (yarım kalmış) parçalar ve tekrarlar elenir
+        uid_to_kayit = {}
+        for satir in satirlar:
+            if (satir.get("anahtar") == self.anahtar and satir["klasor"] == klasor
+                    and satir["uidvalidity"] == uidvalidity and satir["uid"] <= son_uid):
+                uid_to_kayit[satir["uid"]] = satir["kayit"]
+        return [uid_to_kayit[uid] for uid in sorted(uid_to_kayit)]
+
+    # --- Bağlantı ---
+
+    def _baglantiyi_birak(self):
+        if self.imap is not None:
+            try:
+                self.imap.logout()
+            except Exception:
+                pass
+        self.imap = None
+        self.secili_klasor = None
+
+    def _klasoru_sec(self, klasor):
+        # Gerekirse yeniden bağlanır ve klasörü salt okunur seçer
+        if self.imap is None:
+            self.imap = self.baglan()
+        if self.secili_klasor != klasor:
+            status, data = self.imap.select(klasor, readonly=True)
+            if status != "OK":
+                if yavaslatma_mi(data[0] if data else ""):
+                    raise SunucuYavaslatti(data)
+                return None
+            _, uidvalidity = self.imap.response("UIDVALIDITY")
+            self.uidvalidity = uidvalidity[0].decode() if uidvalidity and uidvalidity[0] else None
+            _, uidnext = self.imap.response("UIDNEXT")
+            self.uidnext = int(uidnext[0]) if uidnext and uidnext[0] else None
+            self.mesaj_sayisi = int(data[0]) if data and data[0] and data[0].isdigit() else 0
+            self.secili_klasor = klasor
+        return self.uidvalidity
+
+    def _bekle(self, deneme, hata):
+        # Üstel bekleme (rastgele sapmalı); deneme hakkı biterse hatayı yükseltir
+        if deneme >= EN_FAZLA_DENEME:
+            raise hata
+        sure = min(BEKLEME_TABANI * (2 ** deneme), BEKLEME_TAVANI)
+        sure += random.uniform(0, sure / 2)
+        print(f"⏳ {type(hata).__name__}: {hata} — {sure:.0f} sn sonra tekrar denenecek "
+              f"({deneme + 1}/{EN_FAZLA_DENEME}, parça: {self.parca})")
+        time.sleep(sure)
+
+    def _dene(self, islem):
+        # islem() çağrısını bağlantı kopmalarında ve yavaşlatmalarda yeniden dener
+        deneme = 0
+        while True:
+            try:
+                return islem()
+            except SunucuYavaslatti as e:
+                self.parca = max(self.parca // 2, EN_KUCUK_PARCA)
+                self._baglantiyi_birak()
+                self._bekle(deneme, e)
+            except BAGLANTI_HATALARI as e:
+                self._baglantiyi_birak()
+                self._bekle(deneme, e)
+            except imaplib.IMAP4.error as e:
+                # Giriş hatası gibi kalıcı hatalar yeniden denenmez
+                if not yavaslatma_mi(str(e)):
+                    raise
+                self.parca = max(self.parca // 2, EN_KUCUK_PARCA)
+                self._baglantiyi_birak()
+                self._bekle(deneme, e)
+            deneme += 1
+
+    # --- Çekme ---
+
+    def _bekleyen_uidler(self, klasor, arama=None):
+        # Kontrol noktasındaki son UID'den sonraki (ve varsa arama kriterine uyan) mesajların UID'lerini döner
+        uidvalidity = self._klasoru_sec(klasor)
+        if self.secili_klasor != klasor:
+            return None, []
+
+        klasor_durumu = self.durum["klasorler"].get(klasor)
+        if not klasor_durumu or klasor_durumu.get("uidvalidity") != uidvalidity:
+            # UIDVALIDITY değiştiyse eski UID'ler geçersizdir, klasör baştan taranır
+            klasor_durumu = {"uidvalidity": uidvalidity, "son_uid": 0}
+        son_uid = klasor_durumu["son_uid"]
+
+        # Büyük klasörlerde tek yanıt satırı çok uzamasın diye arama sınırlı UID pencereleriyle yapılır
+        en_buyuk_uid = self._en_buyuk_uid()
+        uidler = []
+        for alt in range(son_uid + 1, en_buyuk_uid + 1, ARAMA_PENCERESI):
+            ust = min(alt + ARAMA_PENCERESI - 1, en_buyuk_uid)
+            kriter = f"UID {alt}:{ust}" + (f" {arama}" if arama else "")
+            status, data = self.imap.uid("SEARCH", None, kriter)
+            if status != "OK":
+                raise yanit_hatasi(data)
+            uidler.extend(uid for uid in map(int, (data[0] or b"").split()) if alt <= uid <= ust)
+        return klasor_durumu, sorted(uidler)
+
+    def _en_buyuk_uid(self):
+        # Seçili klasördeki en büyük UID; SELECT yanıtında UIDNEXT yoksa son mesajın UID'si sorulur
+        if self.uidnext:
+            return self.uidnext - 1
+        if not self.mesaj_sayisi:
+            return 0
+        status, data = self.imap.uid("FETCH", "*", "(UID)")
+        if status != "OK":
+            raise yanit_hatasi(data)
+        uidler = [uid_al(satir[0] if isinstance(satir, tuple) else satir) for satir in data if satir]
+        return max((uid for uid in uidler if uid is not None), default=0)
+
+    def _parca_getir(self, klasor, uidvalidity, uidler, ogeler):
+        # Yeniden bağlanıldıysa klasörün hâlâ aynı UID alanında olduğu doğrulanır
+        guncel_uidvalidity = self._klasoru_sec(klasor)
+        if self.secili_klasor != klasor:
+            raise imaplib.IMAP4.error(f"{klasor} klasörü seçilemedi")
+        if guncel_uidvalidity != uidvalidity:
+            raise UidvalidityDegisti(f"{klasor} UIDVALIDITY {uidvalidity} -> {guncel_uidvalidity}")
+        uid_listesi = ",".join(str(uid) for uid in uidler)
+        status, data = self.imap.uid("FETCH", uid_listesi, ogeler)
+        if status != "OK":
+            raise yanit_hatasi(data)
+        return data
+
+    def _boyutlari_al(self, klasor, uidvalidity, uidler):
+        # Parçaları bayt sınırına göre kesebilmek için mail boyutlarını (RFC822.SIZE) önceden sorar
+        boyutlar = {}
+        for i in range(0, len(uidler), BOYUT_SORGU_PARCA):
+            sorgu = uidler[i:i + BOYUT_SORGU_PARCA]
+            data = self._dene(lambda: self._parca_getir(klasor, uidvalidity, sorgu, "(RFC822.SIZE)"))
+            for satir in data:
+                if isinstance(satir, tuple):
+                    satir = satir[0]
+                if not isinstance(satir, bytes):
+                    continue
+                boyut = re.search(rb"RFC822\.SIZE (\d+)", satir)
+                uid = uid_al(satir)
+                if boyut and uid is not None:
+                    boyutlar[uid] = int(boyut.group(1))
+        return boyutlar
+
+    def _parcayi_kes(self, uidler, i, boyutlar):
+        # Parça hem self.parca adedini hem EN_BUYUK_PARCA_BAYT sınırını aşmaz (en az bir mail)
+        parca = uidler[i:i + self.parca]
+        toplam = 0
+        for n, uid in enumerate(parca):
+            toplam += boyutlar.get(uid, 0)
+            if n and toplam > EN_BUYUK_PARCA_BAYT:
+                return parca[:n]
+        return parca
+
+    def _uidleri_isle(self, klasor, klasor_durumu, uidler, isle, ogeler):
+        uidvalidity = klasor_durumu["uidvalidity"]
+        boyutlar = self._boyutlari_al(klasor, uidvalidity, uidler)
+
+        i = 0
+        while i < len(uidler):
+            def parca_getir():
+                # Parça, yavaşlatmadan sonra küçülmüş boyuta göre her denemede yeniden kesilir
+                parca = self._parcayi_kes(uidler, i, boyutlar)
+                return parca, self._parca_getir(klasor, uidvalidity, parca, ogeler)
+
+            parca, data = self._dene(parca_getir)
+
+            kayitlar = []
+            for meta, ham in fetch_yanitini_bol(data):
+                uid = uid_al(meta)
+                if uid is None:
+                    continue
+                try:
+                    kayit = isle(meta, ham)
+                except Exception as e:
+                    print("⚠️ E-posta işlenemedi:", str(e))
+                    continue
+                if kayit is not None:
+                    kayitlar.append((uid, kayit))
+
+            # Önce kayıtlar, sonra kontrol noktası yazılır; arada kopma olursa parça tekrar işlenir
+            self._kayitlari_ekle(klasor, uidvalidity, kayitlar)
+            klasor_durumu["son_uid"] = parca[-1]
+            self._kontrol_noktasi_yaz()
+            i += len(parca)
+
+            # Sorunsuz geçen parçalardan sonra parça boyutu yavaşça büyütülür
+            self.parca = min(self.parca + max(self.parca // 4, 1), EN_BUYUK_PARCA)
+
+    def klasoru_tara(self, klasor, isle, ogeler="(RFC822)", arama=None):
+        """Klasörü kaldığı yerden tarar; her mesaj için isle(meta, ham) çağrılır.
+
+        arama verilirse (ör. 'X-GM-RAW "in:inbox" SINCE 01-Jan-2024') yalnızca sunucuda bu
+        kritere uyan mesajlar indirilir. isle'nin None dışındaki dönüş değerleri kaydedilir ve
+        (önceki çalıştırmalardakilerle birlikte) liste olarak döner. Kayıtlar JSON'a yazılabilir olmalıdır.
+        """
+        while True:
+            klasor_durumu, uidler = self._dene(lambda: self._bekleyen_uidler(klasor, arama))
+            if klasor_durumu is None:
+                print(f"⚠️ {klasor} klasörü seçilemedi.")
+                return []
+            self.durum["klasorler"][klasor] = klasor_durumu
+            print(f"🔁 {klasor}: {len(uidler)} yeni mail (son işlenen UID: {klasor_durumu['son_uid']})")
+
+            try:
+                self._uidleri_isle(klasor, klasor_durumu, uidler, isle, ogeler)
+            except UidvalidityDegisti as e:
+                # Eski UID'ler geçersizdir; _bekleyen_uidler klasör durumunu sıfırlayıp baştan tarar
+                print(f"⚠️ {e} — klasör baştan taranıyor.")
+                continue
+            return self._kayitlari_yukle(klasor)
+
+    def kapat(self):
+        self._baglantiyi_birak()
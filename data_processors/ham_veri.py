@@ -1,9 +1,16 @@
-import imaplib
 import email
 from email.header import decode_header
 from email.utils import parseaddr, parsedate_to_datetime
-import ssl
-from datetime import datetime, timezone
+import re
+from datetime import datetime, timedelta, timezone
+
+from data_processors.devamli_cekim import DevamliCekim, fetch_yanitini_bol, gmail_baglantisi
+
+# Gmail tek tarama modunda kullanılan klasör, arama ve FETCH öğeleri
+GMAIL_TUM_POSTA = '"[Gmail]/All Mail"'
+GMAIL_ARAMA = 'X-GM-RAW "in:inbox OR in:sent OR is:starred"'
+GMAIL_FETCH_OGELERI = "(X-GM-LABELS X-GM-THRID FLAGS BODY.PEEK[])"
+IMAP_AYLARI = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
 
 def temizle_metin(metin):
     # Metindeki \r ve \n karakterlerini temizle, boşlukları düzenle
@@ -50,150 +57,110 @@ def to_naive_utc(dt):
         return dt.astimezone(timezone.utc).replace(tzinfo=None)
     return dt
 
-def epostalari_getir(kullanici, sifre, baslangic=None, bitis=None):
-    # Gmail IMAP'e SSL ile bağlanır ve giriş yapar
-    context = ssl.create_default_context()
-    imap = imaplib.IMAP4_SSL("imap.gmail.com", port=993, ssl_context=context)
-    imap.login(kullanici, sifre)
-
-    msgid_to_mail = {}
+def epostalari_getir(kullanici, sifre, baslangic=None, bitis=None, kontrol_dosyasi=None):
+    # Gelen kutusundaki mailleri gönderilen cevaplarıyla birlikte döner; yıldızlı dışa aktarımla aynı
+    # "[Gmail]/All Mail" taramasını paylaşır, böylece aynı mail iki kez indirilmez
+    return epostalari_getir_tek_tarama(kullanici, sifre, baslangic, bitis, kontrol_dosyasi)["gelen"]
+
+def epostalari_getir_yildizli(kullanici, sifre, baslangic=None, bitis=None, kontrol_dosyasi=None):
+    # Yıldızlı mailleri döner; gelen kutusu dışa aktarımıyla aynı tek taramayı paylaşır
+    return epostalari_getir_tek_tarama(kullanici, sifre, baslangic, bitis, kontrol_dosyasi)["yildizli"]
+
+def gmail_listesi_ayristir(metin):
+    # '\Inbox "\\Important" etiket' gibi bir IMAP listesini öğelerine ayırır
+    ogeler = []
+    for tirnakli, duz in re.findall(r'"((?:[^"\\]|\\.)*)"|([^\s()]+)', metin or ""):
+        if duz:
+            ogeler.append(duz)
+        else:
+            ogeler.append(re.sub(r"\\(.)", r"\1", tirnakli))
+    return ogeler
+
+def gmail_oznitelikleri_al(meta):
+    # FETCH yanıtının başlık kısmından X-GM-LABELS, X-GM-THRID ve FLAGS değerlerini çıkarır
+    if isinstance(meta, bytes):
+        meta = meta.decode(errors="ignore")
+    thrid = re.search(r"X-GM-THRID (\d+)", meta)
+    etiketler = re.search(r'X-GM-LABELS \(((?:[^()"]|"(?:[^"\\]|\\.)*")*)\)', meta)
+    bayraklar = re.search(r"FLAGS \(([^)]*)\)", meta)
+    return {
+        "thrid": thrid.group(1) if thrid else None,
+        "etiketler": set(gmail_listesi_ayristir(etiketler.group(1))) if etiketler else set(),
+        "bayraklar": set(bayraklar.group(1).split()) if bayraklar else set(),
+    }
+
+def gmail_fetch_yaniti_ayristir(data):
+    # imap.fetch çıktısını (öznitelikler, ham mail) çiftlerine dönüştürür;
+    # literal'den sonra gelen öznitelikler (ör. " FLAGS (\Seen))") da başlığa eklenir
+    return [(gmail_oznitelikleri_al(meta), govde) for meta, govde in fetch_yanitini_bol(data)]
+
+def gmail_klasorleri_belirle(oznitelikler):
+    # Etiket ve bayraklara bakarak mailin gelen, gönderilen ve yıldızlı kutularından hangilerine ait olduğunu bulur
+    etiketler = oznitelikler["etiketler"]
+    klasorler = set()
+    if "\\Inbox" in etiketler:
+        klasorler.add("gelen")
+    if "\\Sent" in etiketler:
+        klasorler.add("gonderilen")
+    if "\\Starred" in etiketler or "\\Flagged" in oznitelikler["bayraklar"]:
+        klasorler.add("yildizli")
+    return klasorler
+
+def gmail_arama_kriteri(baslangic=None, bitis=None):
+    # Tek taramada yalnızca gelen/gönderilen/yıldızlı ve tarih aralığına yakın mailler sunucuda seçilir;
+    # SINCE/BEFORE gün bazlı ve sunucu tarihine göre çalıştığı için bir gün pay bırakılır,
+    # kesin filtre Date başlığına göre istemcide yapılır
+    def imap_tarihi(dt):
+        return f"{dt.day:02d}-{IMAP_AYLARI[dt.month - 1]}-{dt.year}"
+
+    kriter = GMAIL_ARAMA
+    if baslangic:
+        kriter += f" SINCE {imap_tarihi(baslangic - timedelta(days=1))}"
+    if bitis:
+        kriter += f" BEFORE {imap_tarihi(bitis + timedelta(days=2))}"
+    return kriter
+
+def epostalari_getir_tek_tarama(kullanici, sifre, baslangic=None, bitis=None, kontrol_dosyasi=None):
+    # "[Gmail]/All Mail" klasörünü tek geçişte tarar; her mail yalnızca bir kez indirilir.
+    # Kontrol noktası kullanıcı ve tarih aralığına göre paylaşıldığından aynı aralık için sonraki
+    # çağrılar (ör. gelen ardından yıldızlı) yalnızca yeni UID'leri indirir, öncekiler kayıtlardan okunur.
+    # Önceden indirilmiş maillerin sonradan değişen etiketleri kontrol noktası silinene kadar yansımaz.
+    cekim = DevamliCekim(gmail_baglantisi(kullanici, sifre), kontrol_dosyasi,
+                         anahtar=f"tek_tarama|{kullanici}|{baslangic}|{bitis}")
+
+    def mail_isle(meta, ham):
+        oznitelikler = gmail_oznitelikleri_al(meta)
+        klasorler = gmail_klasorleri_belirle(oznitelikler)
+        if not klasorler:
+            return None
 
-    # INBOX klasöründeki tüm mail ID'lerini alır
-    gelen_ids = mail_listesi_al(imap, "INBOX")
-    print(f"📥 INBOX'tan gelen {len(gelen_ids)} e-posta bulundu.")
+        mail = email.message_from_bytes(ham)
 
-    for eposta_id in gelen_ids:
+        tarih_raw = mail.get("Date")
         try:
-            # E-posta içeriğini ham olarak alır
-            _, data = imap.fetch(eposta_id, "(RFC822)")
-            mail = email.message_from_bytes(data[0][1])
-
-            # Mailin tarih bilgisini parse eder
-            tarih_raw = mail.get("Date")
-            try:
-                tarih = parsedate_to_datetime(tarih_raw)
-            except:
-                tarih = None
-
-            # Tarihi naive UTC datetime objesine çevirir
-            tarih = to_naive_utc(tarih)
-
-            print("📨 E-posta ID:", eposta_id)
-            print("🕒 Tarih raw:", tarih_raw)
-            print("🕒 Tarih parsed (naive UTC):", tarih)
-
-            # Tarih filtrelerine göre mailleri atlar
-            if baslangic and tarih and tarih < baslangic:
-                print("⛔ Atlandı (tarih erken):", tarih)
-                continue
-            if bitis and tarih and tarih > bitis:
-                print("⛔ Atlandı (tarih geç):", tarih)
-                continue
+            tarih = parsedate_to_datetime(tarih_raw)
+        except:
+            tarih = None
+        tarih = to_naive_utc(tarih)
 
-            # Mesaj ID al, yoksa atla
-            msg_id = mail.get("Message-ID")
-            if not msg_id:
-                continue
+        # Tarih aralığına göre filtrele
+        if baslangic and tarih and tarih < baslangic:
+            return None
+        if bitis and tarih and tarih > bitis:
+            return None
 
-            # Mesaj verilerini dict'e kaydet
-            msgid_to_mail[msg_id] = {
-                "msg_id": msg_id,
+        sonuc = {"klasorler": sorted(klasorler), "thrid": oznitelikler["thrid"], "kayit": None, "cevap": None}
+        if "gonderilen" in klasorler:
+            sonuc["cevap"] = {
+                "msg_id": mail.get("Message-ID"),
+                "thrid": oznitelikler["thrid"],
                 "in_reply_to": mail.get("In-Reply-To"),
-                "references": mail.get("References"),
-                "kimden": parseaddr(mail.get("From"))[1],
-                "konu": decode_konu(mail.get("Subject")),
                 "tarih": tarih.isoformat() if tarih else None,
-                "base_questions": mail_icerigi_al(mail),
-                "full_answer": None
+                "icerik": mail_icerigi_al(mail),
             }
-        except Exception as e:
-            print("⚠️ E-posta işlenemedi:", str(e))
-            continue
-
-    print(f"📤 Gönderilmiş klasörü taranıyor...")
-
-    # Gönderilen mail klasöründeki tüm mail ID'lerini alır
-    gonderilen_ids = mail_listesi_al(imap, '"[Gmail]/Sent Mail"')
-    print(f"📨 Gönderilen kutusunda {len(gonderilen_ids)} mail var.")
-
-    for eposta_id in gonderilen_ids:
-        try:
-            # Gönderilen mailleri alır
-            _, data = imap.fetch(eposta_id, "(RFC822)")
-            mail = email.message_from_bytes(data[0][1])
-
-            # Tarihi parse eder ve naive UTC'ye çevirir
-            tarih_raw = mail.get("Date")
-            try:
-                tarih = parsedate_to_datetime(tarih_raw)
-            except:
-                tarih = None
-
-            tarih = to_naive_utc(tarih)
-
-            # Tarih aralığına göre filtrele
-            if baslangic and tarih and tarih < baslangic:
-                continue
-            if bitis and tarih and tarih > bitis:
-                continue
-
-            # Eğer bu mail, inbox'daki bir mesaja yanıt ise, cevabı kaydet
-            in_reply_to = mail.get("In-Reply-To")
-            if in_reply_to and in_reply_to in msgid_to_mail:
-                msgid_to_mail[in_reply_to]["full_answer"] = mail_icerigi_al(mail)
-        except Exception as e:
-            print("⚠️ Gönderilen mail işlenemedi:", str(e))
-            continue
-
-    # Bağlantıyı kapat
-    imap.logout()
-    print(f"✅ Toplam alınan e-posta:", len(msgid_to_mail))
-
-    # Sonuçları liste olarak döner
-    return list(msgid_to_mail.values())
-
-def mail_listesi_al(imap, klasor_adi):
-    # Belirtilen klasörü seçer ve içindeki tüm mesaj ID'lerini listeler
-    status, _ = imap.select(klasor_adi)
-    if status != "OK":
-        return []
-    status, mesajlar = imap.search(None, "ALL")
-    if status != "OK":
-        return []
-    return mesajlar[0].split()
-def epostalari_getir_yildizli(kullanici, sifre, baslangic=None, bitis=None):
-    context = ssl.create_default_context()
-    imap = imaplib.IMAP4_SSL("imap.gmail.com", port=993, ssl_context=context)
-    imap.login(kullanici, sifre)
-
-    msgid_to_mail = {}
-
-    # Yıldızlı klasörü seç
-    yildizli_ids = mail_listesi_al(imap, '"[Gmail]/Starred"')
-    print(f"⭐ Yıldızlı kutuda {len(yildizli_ids)} mail var.")
-
-    for eposta_id in yildizli_ids:
-        try:
-            _, data = imap.fetch(eposta_id, "(RFC822)")
-            mail = email.message_from_bytes(data[0][1])
-
-            tarih_raw = mail.get("Date")
-            try:
-                tarih = parsedate_to_datetime(tarih_raw)
-            except:
-                tarih = None
-            tarih = to_naive_utc(tarih)
-
-            if baslangic and tarih and tarih < baslangic:
-                continue
-            if bitis and tarih and tarih > bitis:
-                continue
-
-            msg_id = mail.get("Message-ID")
-            if not msg_id:
-                continue
-
-            msgid_to_mail[msg_id] = {
+        msg_id = mail.get("Message-ID")
+        if msg_id and klasorler & {"gelen", "yildizli"}:
+            sonuc["kayit"] = {
                 "msg_id": msg_id,
                 "in_reply_to": mail.get("In-Reply-To"),
                 "references": mail.get("References"),
@@ -203,11 +170,64 @@ def epostalari_getir_yildizli(kullanici, sifre, baslangic=None, bitis=None):
                 "base_questions": mail_icerigi_al(mail),
                 "full_answer": None
             }
-
-        except Exception as e:
-            print("⚠️ Yıldızlı e-posta işlenemedi:", str(e))
+        return sonuc
+
+    try:
+        sonuclar = cekim.klasoru_tara(GMAIL_TUM_POSTA, mail_isle, GMAIL_FETCH_OGELERI,
+                                      arama=gmail_arama_kriteri(baslangic, bitis))
+    finally:
+        cekim.kapat()
+
+    gelenler = {}
+    yildizlilar = {}
+    gonderilenler = []
+    for sonuc in sonuclar:
+        if sonuc["cevap"]:
+            gonderilenler.append(sonuc["cevap"])
+        kayit = sonuc["kayit"]
+        if not kayit:
+            continue
+        if "gelen" in sonuc["klasorler"]:
+            gelenler[kayit["msg_id"]] = dict(kayit, thrid=sonuc["thrid"])
+        if "yildizli" in sonuc["klasorler"]:
+            yildizlilar[kayit["msg_id"]] = kayit
+
+    cevaplari_thread_ile_esle(gelenler, gonderilenler)
+    for kayit in gelenler.values():
+        kayit.pop("thrid", None)
+
+    print(f"✅ Tek taramada alınan e-posta: {len(gelenler)} gelen, "
+          f"{len(gonderilenler)} gönderilen, {len(yildizlilar)} yıldızlı")
+
+    return {
+        "gelen": list(gelenler.values()),
+        "yildizli": list(yildizlilar.values()),
+    }
+
+def cevaplari_thread_ile_esle(gelenler, gonderilenler):
+    # Gönderilen mailleri X-GM-THRID üzerinden aynı thread'deki gelen sorulara bağlar
+    thread_sorulari = {}
+    for kayit in gelenler.values():
+        if kayit.get("thrid"):
+            thread_sorulari.setdefault(kayit["thrid"], []).append(kayit)
+
+    for cevap in gonderilenler:
+        sorular = thread_sorulari.get(cevap["thrid"])
+        if not sorular:
             continue
 
-    imap.logout()
-    print(f"✅ Yıldızlı kutudan alınan e-posta sayısı: {len(msgid_to_mail)}")
-    return list(msgid_to_mail.values())
\ No newline at end of file
+        # In-Reply-To thread içinde bir soruyu gösteriyorsa onu, yoksa cevaptan önceki son soruyu seç
+        hedef = next((s for s in sorular if s["msg_id"] == cevap["in_reply_to"]), None)
+        if hedef is None:
+            # In-Reply-To var ama eşleşmiyorsa (ör. hedef tarih aralığı dışında) yanlış soruya bağlanmaz
+            if cevap["in_reply_to"]:
+                continue
+            # Kendine gönderilen mail hem soru hem cevap olduğundan kendisiyle eşleştirilmez
+            # Tarihler ISO biçimli metin olduğundan doğrudan karşılaştırılabilir
+            oncekiler = [s for s in sorular
+                         if s["msg_id"] != cevap.get("msg_id")
+                         and not (cevap["tarih"] and s["tarih"] and s["tarih"] > cevap["tarih"])]
+            if not oncekiler:
+                continue
+            hedef = max(oncekiler, key=lambda s: s["tarih"] or "")
+        hedef["full_answer"] = cevap["icerik"]
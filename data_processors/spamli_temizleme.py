@@ -1,4 +1,3 @@
-import imaplib
 import email
 from email.header import decode_header
 from email.utils import parsedate_to_datetime
@@ -10,6 +9,8 @@ from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.pipeline import Pipeline
 
+from data_processors.devamli_cekim import DevamliCekim, gmail_baglantisi
+
 # -- Spam modeli eğitimi --
 df = pd.read_csv("https://raw.githubusercontent.com/Apaulgithub/oibsip_taskno4/main/spam.csv", encoding="ISO-8859-1")
 df = df.rename(columns={"v1": "Category", "v2": "Message"})  # Kolon isimlerini anlamlı yap
@@ -59,74 +60,71 @@ def naive_datetime(dt):
         return dt.astimezone(timezone.utc).replace(tzinfo=None)
     return dt
 
-def spamli_eposta_isle(kullanici, sifre, baslangic=None, bitis=None):
-    # Gmail IMAP sunucusuna bağlan, kullanıcının maillerini çek, spam ve sistem maillerini filtrele
-    imap = imaplib.IMAP4_SSL("imap.gmail.com")
-    imap.login(kullanici, sifre)
+def spamli_eposta_isle(kullanici, sifre, baslangic=None, bitis=None, kontrol_dosyasi=None):
+    # Gmail IMAP sunucusuna bağlan, kullanıcının maillerini çek, spam ve sistem maillerini filtrele;
+    # bağlantı koparsa veya iş yarıda kalırsa kontrol noktasındaki (varsayılan: KONTROL_KLASORU) son UID'den devam edilir
+    cekim = DevamliCekim(gmail_baglantisi(kullanici, sifre), kontrol_dosyasi,
+                         anahtar=f"spam|{kullanici}|{baslangic}|{bitis}")
 
-    spamlar = []
     sistem_konular = ["İki Adımlı Doğrulama", "Güvenlik uyarısı"]
 
-    imap.select("INBOX")
-    status, mesajlar = imap.search(None, "ALL")  # Tüm mailleri ara
-    for eid in mesajlar[0].split():
+    def spam_isle(meta, ham):
+        mail = email.message_from_bytes(ham)
+
+        # Tarih bilgisini al ve datetime formatına çevir
+        tarih_raw = mail.get("Date")
         try:
-            _, data = imap.fetch(eid, "(RFC822)")  # E-postayı al
-            mail = email.message_from_bytes(data[0][1])
-
-            # Tarih bilgisini al ve datetime formatına çevir
-            tarih_raw = mail.get("Date")
-            try:
-                tarih = parsedate_to_datetime(tarih_raw)
-            except:
-                tarih = None
-
-            tarih = naive_datetime(tarih)
-
-            # Başlangıç ve bitiş tarihine göre filtre uygula
-            if baslangic and tarih and tarih < baslangic:
-                continue
-            if bitis and tarih and tarih > bitis:
-                continue
-
-            # Konu satırını al ve decode et
-            konu_raw = mail.get("Subject")
-            konu = ""
-            if konu_raw:
-                decoded = decode_header(konu_raw)
-                subject, enc = decoded[0]
-                konu = subject.decode(enc or "utf-8", errors="ignore") if isinstance(subject, bytes) else subject
-
-            kimden = mail.get("From", "").lower()
-
-            # E-postanın içerik kısmını al (text/plain veya text/html)
-            icerik = ""
-            for part in mail.walk() if mail.is_multipart() else [mail]:
-                if part.get_content_type() in ["text/plain", "text/html"] and part.get_payload(decode=True):
-                    icerik = part.get_payload(decode=True)
-                    break
-
-            temiz_icerik = temizle(icerik)
-            if not temiz_icerik:
-                continue
-
-            # İçeriği spam olarak tespit et, sistem konularında mı veya google kaynaklı mı kontrol et
-            is_spam = detect_spam(temiz_icerik) == 1
-            is_sistem = any(k in konu for k in sistem_konular)
-            is_google = "google" in kimden
-
-            if is_spam or is_sistem or is_google:
-                spamlar.append({
-                    "tarih": tarih.isoformat() if tarih else None,
-                    "konu": konu,
-                    "icerik": temiz_icerik
-                })
-
-        except Exception as e:
-            print(f"⚠️ Hata: {str(e)}")  # Hata durumunda uyarı bas ve devam et
-            continue
-
-    imap.logout()
+            tarih = parsedate_to_datetime(tarih_raw)
+        except:
+            tarih = None
+
+        tarih = naive_datetime(tarih)
+
+        # Başlangıç ve bitiş tarihine göre filtre uygula
+        if baslangic and tarih and tarih < baslangic:
+            return None
+        if bitis and tarih and tarih > bitis:
+            return None
+
+        # Konu satırını al ve decode et
+        konu_raw = mail.get("Subject")
+        konu = ""
+        if konu_raw:
+            decoded = decode_header(konu_raw)
+            subject, enc = decoded[0]
+            konu = subject.decode(enc or "utf-8", errors="ignore") if isinstance(subject, bytes) else subject
+
+        kimden = mail.get("From", "").lower()
+
+        # E-postanın içerik kısmını al (text/plain veya text/html)
+        icerik = ""
+        for part in mail.walk() if mail.is_multipart() else [mail]:
+            if part.get_content_type() in ["text/plain", "text/html"] and part.get_payload(decode=True):
+                icerik = part.get_payload(decode=True)
+                break
+
+        temiz_icerik = temizle(icerik)
+        if not temiz_icerik:
+            return None
+
+        # İçeriği spam olarak tespit et, sistem konularında mı veya google kaynaklı mı kontrol et
+        is_spam = detect_spam(temiz_icerik) == 1
+        is_sistem = any(k in konu for k in sistem_konular)
+        is_google = "google" in kimden
+
+        if is_spam or is_sistem or is_google:
+            return {
+                "tarih": tarih.isoformat() if tarih else None,
+                "konu": konu,
+                "icerik": temiz_icerik
+            }
+        return None
+
+    # Hatalı mailler DevamliCekim içinde uyarı basılarak atlanır
+    try:
+        spamlar = cekim.klasoru_tara("INBOX", spam_isle)
+    finally:
+        cekim.kapat()
 
     print(f"📨 Toplam spam veya sistem mesajı: {len(spamlar)}")
 
@@ -0,0 +1,160 @@
+import re
+import numpy as np
+
+# MinHash / LSH ayarları
+# Eşik, karakter 5-gram kümelerinin MinHash ile tahmin edilen Jaccard benzerliğidir. Kesin bir
+# garanti değildir: eşiği geçen bir çift, hiçbir bantta aynı kovaya düşmezse (LSH S-eğrisi) ya da
+# kovada doğrudan karşılaştırılmazsa kaçabilir. Her mail kovasında yalnızca ilk ve bir önceki
+# üyeyle karşılaştırılır; kümeler tek bağlantılı (zincirleme) birleşir. Bu, kova başına
+# karesel karşılaştırma yapmamak için kabul edilen bir duyarlılık (recall) kaybıdır.
+VARSAYILAN_ESIK = 0.8
+IZIN_SAYISI = 64        # MinHash imza uzunluğu
+SHINGLE_UZUNLUGU = 5    # Karakter k-gram uzunluğu
+MAKS_KARAKTER = 2000    # Uzun mailler için yalnızca baştaki kısım kullanılır
+PARCA_GRAM = 1 << 14    # Tek seferde hash'lenip imzaya indirgenen en fazla k-gram sayısı
+TOHUM = 20240101        # Küme ID'lerinin çalıştırmalar arasında aynı kalması için sabit tohum
+
+_KARISTIRICI = np.uint64(0x9E3779B97F4A7C15)
+_TABAN = np.uint64(1099511628211)
+_AYIRICI = re.compile(r"\W+")
+
+
+# 🧹 Karşılaştırma için metni küçük harfe çevirir, noktalama ve fazla boşlukları atar
+def normalize_metin(text):
+    if not isinstance(text, str):
+        return ""
+    return _AYIRICI.sub(" ", text[:MAKS_KARAKTER].lower()).strip()
+
+
+# ✂️ Normalize edilmiş metinleri, toplam k-gram sayısı PARCA_GRAM'ı geçmeyecek gruplar halinde üretir (en az bir metin)
+def _metin_parcalari(metinler, k=SHINGLE_UZUNLUGU):
+    parca, gram_sayisi = [], 0
+    for metin in metinler:
+        # k'dan kısa metinler tek bir shingle olacak şekilde boşlukla doldurulur
+        bayt = normalize_metin(metin).encode("utf-8").ljust(k)
+        if parca and gram_sayisi + len(bayt) - k + 1 > PARCA_GRAM:
+            yield parca
+            parca, gram_sayisi = [], 0
+        parca.append(bayt)
+        gram_sayisi += len(bayt) - k + 1
+    if parca:
+        yield parca
+
+
+# 🔢 Bir grup metnin karakter k-gram hash'lerini tek numpy dizisinde hesaplar
+def _shingle_hashleri(baytlar, k=SHINGLE_UZUNLUGU):
+    uzunluklar = np.fromiter((len(b) for b in baytlar), dtype=np.int64, count=len(baytlar))
+    dizi = np.frombuffer(b"".join(baytlar), dtype=np.uint8).astype(np.uint64)
+
+    # Her pozisyondaki k-gram için polinom hash (taşma mod 2^64 olarak kabul edilir)
+    gram_hash = np.zeros(len(dizi) - k + 1, dtype=np.uint64)
+    for j in range(k):
+        gram_hash *= _TABAN
+        gram_hash += dizi[j:len(dizi) - k + 1 + j]
+
+    # Metin sınırlarını aşan k-gram'lar atılır
+    gram_sayilari = uzunluklar - k + 1
+    baslangiclar = np.concatenate(([0], np.cumsum(uzunluklar)[:-1]))
+    gram_baslangiclari = np.concatenate(([0], np.cumsum(gram_sayilari)[:-1]))
+    sira = np.arange(gram_sayilari.sum()) - np.repeat(gram_baslangiclari, gram_sayilari)
+    pozisyonlar = np.repeat(baslangiclar, gram_sayilari) + sira
+
+    # Üst 32 bit alınarak hash'ler karıştırılır
+    return (gram_hash[pozisyonlar] * _KARISTIRICI) >> np.uint64(32), gram_baslangiclari
+
+
+# ✍️ Her metin için MinHash imzası üretir (satır: metin, sütun: permütasyon)
+def minhash_imzalari(metinler, izin_sayisi=IZIN_SAYISI):
+    if not metinler:
+        return np.zeros((0, izin_sayisi), dtype=np.uint32)
+
+    # Çarp-kaydır (multiply-shift) hash ailesi: ((a*x + b) mod 2^64) >> 32
+    rng = np.random.default_rng(TOHUM)
+    a = rng.integers(1, 2 ** 63, size=izin_sayisi, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=izin_sayisi, dtype=np.uint64)
+
+    imzalar = np.empty((len(metinler), izin_sayisi), dtype=np.uint32)
+    ilk_metin = 0
+    # Bellek kullanımı derlem boyutundan bağımsız kalsın diye her metin grubu
+    # hash'lenip imzaya indirgendikten sonra bir sonrakine geçilir
+    for parca in _metin_parcalari(metinler):
+        hashler, ofsetler = _shingle_hashleri(parca)
+
+        # Geçici dizi oluşmaması için işlemler yerinde yapılır
+        degerler = np.multiply(a[:, None], hashler[None, :])
+        degerler += b[:, None]
+        degerler >>= np.uint64(32)
+        imzalar[ilk_metin:ilk_metin + len(parca)] = np.minimum.reduceat(degerler, ofsetler, axis=1).T
+
+        ilk_metin += len(parca)
+    return imzalar
+
+
+# 🎚️ Eşik değerine en yakın LSH bant/satır sayısını seçer: eşik ≈ (1/bant)^(1/satır)
+def lsh_parametreleri(esik, izin_sayisi=IZIN_SAYISI):
+    en_iyi = None
+    for satir in range(1, izin_sayisi + 1):
+        bant = izin_sayisi // satir
+        fark = abs((1 / bant) ** (1 / satir) - esik)
+        if en_iyi is None or fark < en_iyi[0]:
+            en_iyi = (fark, bant, satir)
+    return en_iyi[1], en_iyi[2]
+
+
+def _kok_bul(ebeveyn, i):
+    while ebeveyn[i] != i:
+        ebeveyn[i] = ebeveyn[ebeveyn[i]]
+        i = ebeveyn[i]
+    return i
+
+
+# 🪣 Aynı LSH kovasına düşen ve tahmini benzerliği eşiği geçen metinleri birleştirip küme numarası döner
+def lsh_kumeleri(imzalar, esik=VARSAYILAN_ESIK):
+    n, izin_sayisi = imzalar.shape
+    ebeveyn = list(range(n))
+    bant, satir = lsh_parametreleri(esik, izin_sayisi)
+
+    for i in range(bant):
+        dilim = np.ascontiguousarray(imzalar[:, i * satir:(i + 1) * satir])
+        anahtarlar = dilim.view(np.dtype((np.void, dilim.dtype.itemsize * satir))).ravel()
+        _, ilk_indeks, ters = np.unique(anahtarlar, return_index=True, return_inverse=True)
+
+        # Her kovadaki metin, kovanın ilk metniyle ve kovadaki bir önceki metinle karşılaştırılır
+        ters = ters.ravel()
+        temsilci = ilk_indeks[ters]
+        sira = np.argsort(ters, kind="stable")
+        ayni_kova = ters[sira[1:]] == ters[sira[:-1]]
+        onceki = np.full(n, -1)
+        onceki[sira[1:][ayni_kova]] = sira[:-1][ayni_kova]
+
+        ilk_adaylar = np.nonzero(temsilci != np.arange(n))[0]
+        onceki_adaylar = np.nonzero((onceki >= 0) & (onceki != temsilci))[0]
+        adaylar = np.concatenate((ilk_adaylar, onceki_adaylar))
+        eslesler = np.concatenate((temsilci[ilk_adaylar], onceki[onceki_adaylar]))
+        if not len(adaylar):
+            continue
+        benzerlik = (imzalar[adaylar] == imzalar[eslesler]).mean(axis=1)
+        for j, t in zip(adaylar[benzerlik >= esik], eslesler[benzerlik >= esik]):
+            kok_j, kok_t = _kok_bul(ebeveyn, j), _kok_bul(ebeveyn, t)
+            if kok_j != kok_t:
+                ebeveyn[max(kok_j, kok_t)] = min(kok_j, kok_t)
+
+    # Küme numaraları ilk görünme sırasına göre 0'dan verilir
+    kok_to_kume = {}
+    return [kok_to_kume.setdefault(_kok_bul(ebeveyn, i), len(kok_to_kume)) for i in range(n)]
+
+
+# 🔁 Temizlenmiş kayıtlara "kume_id" ekler ve küme başına soru sayısı raporunu döner
+def yakin_kopyalari_kumele(zincirler, esik=VARSAYILAN_ESIK, alan="base_questions"):
+    metinler = [z.get(alan, "") for z in zincirler]
+    kume_idleri = lsh_kumeleri(minhash_imzalari(metinler), esik)
+
+    rapor = {}
+    for zincir, kume_id in zip(zincirler, kume_idleri):
+        zincir["kume_id"] = kume_id
+        if kume_id not in rapor:
+            rapor[kume_id] = {"kume_id": kume_id, "adet": 0, "ornek_soru": zincir.get(alan, "")}
+        rapor[kume_id]["adet"] += 1
+
+    # En sık sorulan kümeler en üstte
+    return sorted(rapor.values(), key=lambda k: (-k["adet"], k["kume_id"]))
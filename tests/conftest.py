@@ -0,0 +1,15 @@
+import pytest
+
+from data_processors import devamli_cekim
+
+
+@pytest.fixture(autouse=True)
+def beklemeyi_kapat(monkeypatch):
+    # Yeniden deneme beklemeleri testleri yavaşlatmasın diye atlanır
+    monkeypatch.setattr(devamli_cekim.time, "sleep", lambda sure: None)
+
+
+@pytest.fixture(autouse=True)
+def kontrol_klasorunu_gecici_yap(monkeypatch, tmp_path):
+    # Varsayılan kontrol noktaları testlerde kullanıcının ev dizini yerine geçici klasöre yazılır
+    monkeypatch.setattr(devamli_cekim, "KONTROL_KLASORU", tmp_path / "kontrol")
@@ -0,0 +1,108 @@
+import imaplib
+import re
+
+
+def mail_olustur(msg_id, tarih="Mon, 1 Jan 2024 10:00:00 +0000", govde="soru", in_reply_to=None,
+                 konu="Soru", kimden="musteri@example.com"):
+    # Testler için RFC822 biçiminde basit bir mail üretir
+    satirlar = [
+        f"Message-ID: {msg_id}",
+        f"Subject: {konu}",
+        f"From: {kimden}",
+        f"Date: {tarih}",
+    ]
+    if in_reply_to:
+        satirlar.append(f"In-Reply-To: {in_reply_to}")
+    return ("\r\n".join(satirlar) + "\r\n\r\n" + govde).encode()
+
+
+class SahteSunucu:
+    """UID SEARCH/FETCH, UIDVALIDITY ve Gmail X-GM-* özniteliklerini taklit eden sahte IMAP sunucusu.
+
+    klasorler: {klasor: {uid: ham_mail veya (gmail_oznitelikleri, ham_mail)}}
+    govde_hatalari: her gövde FETCH'inde sırayla tüketilir; None normal yanıt, Exception
+    yükseltilir, tuple ise olduğu gibi (ör. ("NO", [b"[THROTTLED]"])) döner.
+    """
+
+    def __init__(self, klasorler, uidvalidity="1"):
+        self.klasorler = klasorler
+        self.uidvalidity = {klasor: uidvalidity for klasor in klasorler}
+        self.govde_hatalari = []
+        self.govde_fetchleri = []
+        self.aramalar = []
+        self.baglanti_sayisi = 0
+        self.uidnext_gonder = True
+        self.en_uzun_satir = None  # imaplib._MAXLINE taklidi
+
+    def baglan(self):
+        self.baglanti_sayisi += 1
+        return SahteImap(self)
+
+
+class SahteImap:
+    def __init__(self, sunucu):
+        self.sunucu = sunucu
+        self.secili = None
+
+    def select(self, klasor, readonly=False):
+        if klasor not in self.sunucu.klasorler:
+            return "NO", [b"[NONEXISTENT] Unknown Mailbox"]
+        self.secili = klasor
+        return "OK", [str(len(self.sunucu.klasorler[klasor])).encode()]
+
+    def response(self, ad):
+        if ad == "UIDNEXT":
+            if not self.sunucu.uidnext_gonder:
+                return ad, [None]
+            return ad, [str(max(self.sunucu.klasorler[self.secili], default=0) + 1).encode()]
+        return ad, [self.sunucu.uidvalidity[self.secili].encode()]
+
+    def uid(self, komut, *args):
+        mesajlar = self.sunucu.klasorler[self.secili]
+        if komut == "SEARCH":
+            kriter = args[-1]
+            self.sunucu.aramalar.append(kriter)
+            alt, ust = map(int, re.match(r"UID (\d+):(\d+)", kriter).groups())
+            uidler = [uid for uid in sorted(mesajlar) if alt <= uid <= ust]
+            if "X-GM-RAW" in kriter:
+                # Tarih kriterleri yok sayılır; "in:inbox OR in:sent OR is:starred" taklit edilir
+                uidler = [uid for uid in uidler if isinstance(mesajlar[uid], tuple)
+                          and re.search(r"\\(Inbox|Sent|Starred|Flagged)\b", mesajlar[uid][0])]
+            satir = " ".join(map(str, uidler)).encode()
+            if self.sunucu.en_uzun_satir and len(satir) > self.sunucu.en_uzun_satir:
+                raise imaplib.IMAP4.error(f"got more than {self.sunucu.en_uzun_satir} bytes")
+            return "OK", [satir]
+
+        if args[0] == "*":
+            return "OK", [f"{len(mesajlar)} (UID {max(mesajlar)})".encode()]
+        uidler = [int(uid) for uid in args[0].split(",")]
+        ogeler = args[1]
+        if ogeler == "(RFC822.SIZE)":
+            return "OK", [f"{uid} (UID {uid} RFC822.SIZE {len(self._ham(mesajlar[uid]))})".encode()
+                          for uid in uidler if uid in mesajlar]
+
+        if self.sunucu.govde_hatalari:
+            hata = self.sunucu.govde_hatalari.pop(0)
+            if isinstance(hata, Exception):
+                raise hata
+            if hata is not None:
+                return hata
+        self.sunucu.govde_fetchleri.append(uidler)
+
+        yanit = []
+        for uid in uidler:
+            if uid not in mesajlar:
+                continue
+            mesaj = mesajlar[uid]
+            oznitelik = mesaj[0] if isinstance(mesaj, tuple) else ""
+            yanit.append((f"{uid} (UID {uid} {oznitelik} BODY[] {{{len(self._ham(mesaj))}}}".encode(),
+                          self._ham(mesaj)))
+            yanit.append(b")")
+        return "OK", yanit
+
+    def logout(self):
+        pass
+
+    @staticmethod
+    def _ham(mesaj):
+        return mesaj[1] if isinstance(mesaj, tuple) else mesaj
@@ -0,0 +1,174 @@
+import imaplib
+
+import pytest
+
+from data_processors import devamli_cekim
+from data_processors.devamli_cekim import DevamliCekim
+from tests.sahte_imap import SahteSunucu, mail_olustur
+
+
+@pytest.fixture(autouse=True)
+def kucuk_parcalar(monkeypatch):
+    monkeypatch.setattr(devamli_cekim, "BASLANGIC_PARCA", 8)
+
+
+def msg_id_al(meta, ham):
+    for satir in ham.decode().split("\r\n"):
+        if satir.startswith("Message-ID: "):
+            return satir[len("Message-ID: "):]
+    return None
+
+
+def inbox(adet, baslangic=1):
+    return {uid: mail_olustur(f"<m{uid}>") for uid in range(baslangic, baslangic + adet)}
+
+
+def test_baglanti_koparsa_yeniden_baglanip_devam_eder():
+    sunucu = SahteSunucu({"INBOX": inbox(30)})
+    sunucu.govde_hatalari = [None, imaplib.IMAP4.abort("socket error: EOF")]
+
+    kayitlar = DevamliCekim(sunucu.baglan).klasoru_tara("INBOX", msg_id_al)
+
+    assert kayitlar == [f"<m{uid}>" for uid in range(1, 31)]
+    assert sunucu.baglanti_sayisi == 2
+    # Kopmadan önce tamamlanan ilk parça tekrar indirilmez
+    indirilenler = [uid for parca in sunucu.govde_fetchleri for uid in parca]
+    assert sorted(indirilenler) == list(range(1, 31))
+
+
+def test_yavaslatmada_parca_boyutu_yariya_iner(monkeypatch):
+    monkeypatch.setattr(devamli_cekim, "BASLANGIC_PARCA", 16)
+    sunucu = SahteSunucu({"INBOX": inbox(20)})
+    sunucu.govde_hatalari = [("NO", [b"[THROTTLED] Request rate too high"])]
+
+    cekim = DevamliCekim(sunucu.baglan)
+    kayitlar = cekim.klasoru_tara("INBOX", msg_id_al)
+
+    assert len(kayitlar) == 20
+    assert len(sunucu.govde_fetchleri[0]) == 8
+
+
+def test_kalici_giris_hatasi_yeniden_denenmez():
+    def baglan():
+        raise imaplib.IMAP4.error("[AUTHENTICATIONFAILED] Invalid credentials")
+
+    with pytest.raises(imaplib.IMAP4.error):
+        DevamliCekim(baglan).klasoru_tara("INBOX", msg_id_al)
+
+
+def test_yavaslatma_olmayan_no_yaniti_yeniden_denenmez():
+    sunucu = SahteSunucu({"INBOX": inbox(10)})
+    sunucu.govde_hatalari = [("NO", [b"[NONEXISTENT] Some messages could not be FETCHed"])]
+
+    with pytest.raises(imaplib.IMAP4.error, match="NONEXISTENT"):
+        DevamliCekim(sunucu.baglan).klasoru_tara("INBOX", msg_id_al)
+
+    assert sunucu.baglanti_sayisi == 1
+
+
+def test_buyuk_klasor_sinirli_uid_pencereleriyle_aranir(monkeypatch):
+    monkeypatch.setattr(devamli_cekim, "ARAMA_PENCERESI", 8)
+    sunucu = SahteSunucu({"INBOX": inbox(30)})
+    sunucu.en_uzun_satir = 30
+
+    kayitlar = DevamliCekim(sunucu.baglan).klasoru_tara("INBOX", msg_id_al)
+
+    assert kayitlar == [f"<m{uid}>" for uid in range(1, 31)]
+    assert sunucu.aramalar == ["UID 1:8", "UID 9:16", "UID 17:24", "UID 25:30"]
+
+
+def test_uidnext_yoksa_son_uid_sunucudan_sorulur():
+    sunucu = SahteSunucu({"INBOX": inbox(5, baslangic=3)})
+    sunucu.uidnext_gonder = False
+
+    kayitlar = DevamliCekim(sunucu.baglan).klasoru_tara("INBOX", msg_id_al)
+
+    assert kayitlar == [f"<m{uid}>" for uid in range(3, 8)]
+    assert sunucu.aramalar == ["UID 1:7"]
+
+
+def test_ayni_kontrol_noktasiyla_yalnizca_yeni_uidler_cekilir(tmp_path):
+    kontrol = tmp_path / "kontrol.json"
+    sunucu = SahteSunucu({"INBOX": inbox(10)})
+    DevamliCekim(sunucu.baglan, kontrol, anahtar="is").klasoru_tara("INBOX", msg_id_al)
+
+    sunucu.klasorler["INBOX"].update(inbox(5, baslangic=11))
+    sunucu.govde_fetchleri.clear()
+    kayitlar = DevamliCekim(sunucu.baglan, kontrol, anahtar="is").klasoru_tara("INBOX", msg_id_al)
+
+    assert sunucu.govde_fetchleri == [list(range(11, 16))]
+    assert kayitlar == [f"<m{uid}>" for uid in range(1, 16)]
+
+
+def test_yarida_kesilen_is_kaldigi_uidden_devam_eder(tmp_path):
+    kontrol = tmp_path / "kontrol.json"
+    sunucu = SahteSunucu({"INBOX": inbox(20)})
+    sunucu.govde_hatalari = [None] + [imaplib.IMAP4.abort("EOF")] * (devamli_cekim.EN_FAZLA_DENEME + 1)
+
+    with pytest.raises(imaplib.IMAP4.abort):
+        DevamliCekim(sunucu.baglan, kontrol, anahtar="is").klasoru_tara("INBOX", msg_id_al)
+
+    sunucu.govde_hatalari = []
+    sunucu.govde_fetchleri.clear()
+    kayitlar = DevamliCekim(sunucu.baglan, kontrol, anahtar="is").klasoru_tara("INBOX", msg_id_al)
+
+    assert sunucu.govde_fetchleri[0][0] == 9
+    assert kayitlar == [f"<m{uid}>" for uid in range(1, 21)]
+
+
+def test_kontrol_dosyasi_verilmezse_anahtardan_turetilen_dosyadan_devam_eder():
+    sunucu = SahteSunucu({"INBOX": inbox(20)})
+    sunucu.govde_hatalari = [None] + [imaplib.IMAP4.abort("EOF")] * (devamli_cekim.EN_FAZLA_DENEME + 1)
+
+    with pytest.raises(imaplib.IMAP4.abort):
+        DevamliCekim(sunucu.baglan, anahtar="gelen|kullanici|None|None").klasoru_tara("INBOX", msg_id_al)
+
+    sunucu.govde_hatalari = []
+    sunucu.govde_fetchleri.clear()
+    cekim = DevamliCekim(sunucu.baglan, anahtar="gelen|kullanici|None|None")
+    kayitlar = cekim.klasoru_tara("INBOX", msg_id_al)
+
+    assert cekim.kontrol_dosyasi.parent == devamli_cekim.KONTROL_KLASORU
+    assert cekim.kontrol_dosyasi.exists()
+    assert sunucu.govde_fetchleri[0][0] == 9
+    assert kayitlar == [f"<m{uid}>" for uid in range(1, 21)]
+
+
+def test_uidvalidity_degisirse_klasor_bastan_taranir(tmp_path):
+    sunucu = SahteSunucu({"INBOX": inbox(16)})
+
+    def ilk_parcadan_sonra_uid_alanini_degistir(meta, ham):
+        if msg_id_al(meta, ham) == "<m8>":
+            sunucu.uidvalidity["INBOX"] = "2"
+            sunucu.govde_hatalari = [imaplib.IMAP4.abort("EOF")]
+        return msg_id_al(meta, ham)
+
+    cekim = DevamliCekim(sunucu.baglan, tmp_path / "kontrol.json", anahtar="is")
+    kayitlar = cekim.klasoru_tara("INBOX", ilk_parcadan_sonra_uid_alanini_degistir)
+
+    assert kayitlar == [f"<m{uid}>" for uid in range(1, 17)]
+    assert cekim.durum["klasorler"]["INBOX"] == {"uidvalidity": "2", "son_uid": 16}
+    assert sunucu.govde_fetchleri[1][0] == 1
+
+
+def test_kontrol_noktasi_silinse_de_eski_kayitlar_yeni_ise_karismaz(tmp_path):
+    kontrol = tmp_path / "kontrol.json"
+    sunucu = SahteSunucu({"INBOX": inbox(25)})
+    DevamliCekim(sunucu.baglan, kontrol, anahtar="A").klasoru_tara("INBOX", lambda m, h: "A-" + msg_id_al(m, h))
+    kontrol.unlink()
+
+    kayitlar = DevamliCekim(sunucu.baglan, kontrol, anahtar="B").klasoru_tara(
+        "INBOX", lambda m, h: "B" if devamli_cekim.uid_al(m) < 10 else None)
+
+    assert kayitlar == ["B"] * 9
+
+
+def test_parca_bayt_sinirini_asmaz(monkeypatch):
+    sunucu = SahteSunucu({"INBOX": inbox(6)})
+    tek_mail = len(sunucu.klasorler["INBOX"][1])
+    monkeypatch.setattr(devamli_cekim, "EN_BUYUK_PARCA_BAYT", tek_mail * 2)
+
+    kayitlar = DevamliCekim(sunucu.baglan).klasoru_tara("INBOX", msg_id_al)
+
+    assert len(kayitlar) == 6
+    assert [len(parca) for parca in sunucu.govde_fetchleri] == [2, 2, 2]
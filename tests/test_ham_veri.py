@@ -0,0 +1,130 @@
+from datetime import datetime
+
+from data_processors import ham_veri
+from data_processors.ham_veri import (
+    cevaplari_thread_ile_esle,
+    gmail_fetch_yaniti_ayristir,
+    gmail_klasorleri_belirle,
+    gmail_oznitelikleri_al,
+)
+from tests.sahte_imap import SahteSunucu, mail_olustur
+
+
+def test_tirnakli_ve_kacisli_etiketler_ayristirilir():
+    meta = rb'1 (UID 7 X-GM-THRID 1500 X-GM-LABELS (\Inbox "\\Important" "Proje (2024)" "Ali \"VIP\"") FLAGS (\Seen)'
+
+    oznitelikler = gmail_oznitelikleri_al(meta)
+
+    assert oznitelikler["thrid"] == "1500"
+    assert oznitelikler["etiketler"] == {"\\Inbox", "\\Important", "Proje (2024)", 'Ali "VIP"'}
+    assert oznitelikler["bayraklar"] == {"\\Seen"}
+
+
+def test_flagged_bayragi_yildizli_sayilir():
+    oznitelikler = gmail_oznitelikleri_al(rb"1 (X-GM-THRID 1 X-GM-LABELS () FLAGS (\Seen \Flagged)")
+
+    assert gmail_klasorleri_belirle(oznitelikler) == {"yildizli"}
+
+
+def test_etiketsiz_arsiv_maili_hicbir_klasore_girmez():
+    oznitelikler = gmail_oznitelikleri_al(rb'1 (X-GM-THRID 1 X-GM-LABELS ("Fatura") FLAGS (\Seen)')
+
+    assert gmail_klasorleri_belirle(oznitelikler) == set()
+
+
+def test_literalden_sonra_gelen_oznitelikler_birlestirilir():
+    data = [
+        (rb"1 (UID 1 X-GM-THRID 11 X-GM-LABELS (\Sent) BODY[] {5}", b"ham-1"),
+        rb" FLAGS (\Seen \Flagged))",
+        (rb"2 (UID 2 X-GM-THRID 12 X-GM-LABELS (\Inbox) FLAGS () BODY[] {5}", b"ham-2"),
+        b")",
+    ]
+
+    sonuc = gmail_fetch_yaniti_ayristir(data)
+
+    assert [govde for _, govde in sonuc] == [b"ham-1", b"ham-2"]
+    assert sonuc[0][0]["bayraklar"] == {"\\Seen", "\\Flagged"}
+    assert gmail_klasorleri_belirle(sonuc[0][0]) == {"gonderilen", "yildizli"}
+
+
+def soru(msg_id, tarih, thrid="t1"):
+    return {"msg_id": msg_id, "tarih": tarih, "thrid": thrid, "full_answer": None}
+
+
+def cevap(icerik, tarih, in_reply_to=None, msg_id=None, thrid="t1"):
+    return {"msg_id": msg_id, "thrid": thrid, "in_reply_to": in_reply_to,
+            "tarih": tarih, "icerik": icerik}
+
+
+def test_in_reply_to_eslesen_soruya_baglanir():
+    gelenler = {"<q1>": soru("<q1>", "2024-01-01T10:00:00"), "<q2>": soru("<q2>", "2024-01-01T11:00:00")}
+
+    cevaplari_thread_ile_esle(gelenler, [cevap("ilk soruya cevap", "2024-01-01T12:00:00", in_reply_to="<q1>")])
+
+    assert gelenler["<q1>"]["full_answer"] == "ilk soruya cevap"
+    assert gelenler["<q2>"]["full_answer"] is None
+
+
+def test_in_reply_to_yoksa_cevaptan_onceki_son_soruya_baglanir():
+    gelenler = {
+        "<q1>": soru("<q1>", "2024-01-01T10:00:00"),
+        "<q2>": soru("<q2>", "2024-01-01T11:00:00"),
+        "<q3>": soru("<q3>", "2024-01-01T13:00:00"),
+    }
+
+    cevaplari_thread_ile_esle(gelenler, [cevap("cevap", "2024-01-01T12:00:00")])
+
+    assert [gelenler[k]["full_answer"] for k in ("<q1>", "<q2>", "<q3>")] == [None, "cevap", None]
+
+
+def test_kendine_gonderilen_mail_kendi_cevabi_olmaz():
+    gelenler = {"<self>": soru("<self>", "2024-01-01T10:00:00")}
+
+    cevaplari_thread_ile_esle(gelenler, [cevap("not", "2024-01-01T10:00:00", msg_id="<self>")])
+
+    assert gelenler["<self>"]["full_answer"] is None
+
+
+def test_in_reply_to_aralik_disindaysa_baska_soruya_baglanmaz():
+    gelenler = {"<q2>": soru("<q2>", "2024-01-01T11:00:00")}
+
+    cevaplari_thread_ile_esle(gelenler, [cevap("eski soruya cevap", "2024-01-01T12:00:00", in_reply_to="<q0>")])
+
+    assert gelenler["<q2>"]["full_answer"] is None
+
+
+def gmail_sunucusu():
+    return SahteSunucu({ham_veri.GMAIL_TUM_POSTA: {
+        1: (r"X-GM-THRID 11 X-GM-LABELS (\Inbox) FLAGS (\Seen)",
+            mail_olustur("<q1>", govde="Kargom nerede?")),
+        2: (r"X-GM-THRID 11 X-GM-LABELS (\Sent) FLAGS (\Seen)",
+            mail_olustur("<a1>", tarih="Mon, 1 Jan 2024 11:00:00 +0000", govde="Yolda.", in_reply_to="<q1>")),
+        3: (r'X-GM-THRID 12 X-GM-LABELS ("Fatura") FLAGS (\Seen)', mail_olustur("<arsiv>")),
+        4: (r"X-GM-THRID 13 X-GM-LABELS () FLAGS (\Flagged)", mail_olustur("<s1>", govde="Önemli")),
+    }})
+
+
+def test_tek_tarama_yalnizca_siniflanan_maillerin_govdesini_indirir(monkeypatch):
+    sunucu = gmail_sunucusu()
+    monkeypatch.setattr(ham_veri, "gmail_baglantisi", lambda kullanici, sifre: sunucu.baglan)
+
+    sonuc = ham_veri.epostalari_getir_tek_tarama("kullanici", "sifre", baslangic=datetime(2024, 1, 1))
+
+    assert [(k["msg_id"], k["full_answer"]) for k in sonuc["gelen"]] == [("<q1>", "Yolda.")]
+    assert [k["msg_id"] for k in sonuc["yildizli"]] == ["<s1>"]
+    assert [uid for parca in sunucu.govde_fetchleri for uid in parca] == [1, 2, 4]
+    assert sunucu.aramalar == [f"UID 1:4 {ham_veri.GMAIL_ARAMA} SINCE 31-Dec-2023"]
+
+
+def test_gelen_ve_yildizli_disa_aktarim_ayni_taramayi_paylasir(monkeypatch):
+    sunucu = gmail_sunucusu()
+    monkeypatch.setattr(ham_veri, "gmail_baglantisi", lambda kullanici, sifre: sunucu.baglan)
+
+    gelenler = ham_veri.epostalari_getir("kullanici", "sifre", baslangic=datetime(2024, 1, 1))
+    yildizlilar = ham_veri.epostalari_getir_yildizli("kullanici", "sifre", baslangic=datetime(2024, 1, 1))
+
+    assert [(k["msg_id"], k["full_answer"]) for k in gelenler] == [("<q1>", "Yolda.")]
+    assert [k["msg_id"] for k in yildizlilar] == ["<s1>"]
+    # İkinci çağrıda yeni UID olmadığından arama yapılmaz, daha önce indirilen gövdeler tekrar indirilmez
+    assert [uid for parca in sunucu.govde_fetchleri for uid in parca] == [1, 2, 4]
+    assert sunucu.aramalar == [f"UID 1:4 {ham_veri.GMAIL_ARAMA} SINCE 31-Dec-2023"]
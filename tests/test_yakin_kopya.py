@@ -0,0 +1,82 @@
+import copy
+
+import numpy as np
+import pytest
+
+from data_processors import yakin_kopya
+from data_processors.yakin_kopya import IZIN_SAYISI, lsh_parametreleri, minhash_imzalari, yakin_kopyalari_kumele
+
+KAYITLAR = [
+    {"base_questions": "Merhaba, siparişim 3 gündür kargoya verilmedi, ne zaman gönderilecek?"},
+    {"base_questions": "Merhaba siparişim 3 gündür kargoya verilmedi. Ne zaman gönderilecek??"},
+    {"base_questions": "Fatura adresimi nasıl değiştirebilirim? Hesap ayarlarında bulamadım."},
+    {"base_questions": "merhaba, siparişim 3 gündür kargoya verilmedi; ne zaman gönderilecek"},
+    {"base_questions": "Uygulamaya giriş yaparken iki adımlı doğrulama kodu gelmiyor."},
+]
+
+
+def test_yakin_sorular_ayni_kumede_farkli_sorular_ayri_kumede():
+    kayitlar = copy.deepcopy(KAYITLAR)
+
+    yakin_kopyalari_kumele(kayitlar)
+
+    kumeler = [k["kume_id"] for k in kayitlar]
+    assert kumeler[0] == kumeler[1] == kumeler[3]
+    assert len({kumeler[0], kumeler[2], kumeler[4]}) == 3
+
+
+def test_kume_idleri_calistirmalar_arasinda_ayni_kalir():
+    ilk, ikinci = copy.deepcopy(KAYITLAR), copy.deepcopy(KAYITLAR)
+
+    assert yakin_kopyalari_kumele(ilk) == yakin_kopyalari_kumele(ikinci)
+    assert [k["kume_id"] for k in ilk] == [k["kume_id"] for k in ikinci]
+
+
+def test_rapor_toplami_kayit_sayisina_esittir():
+    kayitlar = copy.deepcopy(KAYITLAR) * 3
+
+    rapor = yakin_kopyalari_kumele(kayitlar)
+
+    assert sum(k["adet"] for k in rapor) == len(kayitlar)
+    assert rapor[0]["adet"] == max(k["adet"] for k in rapor)
+
+
+def test_bos_girdi():
+    assert yakin_kopyalari_kumele([]) == []
+
+
+def test_bos_kisa_ve_ascii_disi_metinler_kumelenir():
+    kayitlar = [{"base_questions": None}, {}, {"base_questions": "?"}, {"base_questions": "çğıöşü ÇĞİÖŞÜ"}]
+
+    rapor = yakin_kopyalari_kumele(kayitlar)
+
+    assert all("kume_id" in k for k in kayitlar)
+    assert sum(k["adet"] for k in rapor) == len(kayitlar)
+
+
+@pytest.mark.parametrize("parca_gram", [1, 40, 200])
+def test_parcali_imzalar_tek_seferdekilerle_ayni(monkeypatch, parca_gram):
+    metinler = [k["base_questions"] for k in KAYITLAR] + [None, "", "?", "çğıöşü " * 400]
+    monkeypatch.setattr(yakin_kopya, "PARCA_GRAM", 1 << 30)
+    tek_seferde = minhash_imzalari(metinler)
+
+    monkeypatch.setattr(yakin_kopya, "PARCA_GRAM", parca_gram)
+    parcali = minhash_imzalari(metinler)
+
+    assert np.array_equal(parcali, tek_seferde)
+
+
+@pytest.mark.parametrize("esik", [0.05, 0.1, 0.3, 0.5, 0.7, 0.8, 0.9, 0.95, 1.0])
+def test_lsh_parametreleri_esige_yakin_bant_satir_secer(esik):
+    bant, satir = lsh_parametreleri(esik)
+
+    assert bant >= 1 and satir >= 1
+    assert bant * satir <= IZIN_SAYISI
+    assert abs((1 / bant) ** (1 / satir) - esik) < 0.1
+
+
+def test_lsh_parametreleri_esikle_birlikte_artar():
+    esikler = [i / 20 for i in range(1, 21)]
+    tahmini = [(1 / b) ** (1 / r) for b, r in map(lsh_parametreleri, esikler)]
+
+    assert tahmini == sorted(tahmini)